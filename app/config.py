@@ -1,7 +1,9 @@
 import os
+import functools
 from dataclasses import dataclass
 from typing import Optional
 from decimal import Decimal
+from dotenv import load_dotenv
 
 @dataclass
 class TradingConfig:
@@ -47,11 +49,18 @@ class TradingConfig:
     HEALTH_CHECK_PORT: int = 8080
     
     @classmethod
+    @functools.lru_cache(maxsize=1)
     def from_env(cls):
-        """Load configuration from environment variables"""
+        """Load configuration from environment variables (built once, then cached)
+
+        .env is loaded here so every entry point caches a config that
+        includes it, not just app.main.
+        """
+        load_dotenv()
         config = cls()
         
         # Bybit
+        config.BYBIT_TESTNET = os.getenv('BYBIT_TESTNET', 'true').lower() == 'true'
         config.BYBIT_API_KEY = os.getenv('BYBIT_API_KEY', '')
         config.BYBIT_API_SECRET = os.getenv('BYBIT_API_SECRET', '')
         
@@ -69,6 +78,10 @@ class TradingConfig:
         # Database
         config.DATABASE_URL = os.getenv('DATABASE_URL', config.DATABASE_URL)
         
+        # Render
+        config.RENDER = os.getenv('RENDER', 'false').lower() == 'true'
+        config.HEALTH_CHECK_PORT = int(os.getenv('HEALTH_CHECK_PORT', config.HEALTH_CHECK_PORT))
+        
         return config
     
     def validate(self) -> bool:
@@ -2,30 +2,163 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, JSON
-from datetime import datetime
+from sqlalchemy import event, Index, text, func
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.exc import OperationalError, StatementError
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from contextlib import asynccontextmanager
+import asyncio
+import logging
 import os
+import orjson
+from decimal import Decimal
 from app.config import TradingConfig
 
-config = TradingConfig.from_env()
+logger = logging.getLogger(__name__)
 
-# Use SQLite for Render (file-based)
-if config.RENDER:
-    # Use file-based SQLite on Render
-    DATABASE_URL = "sqlite+aiosqlite:///./data/trades.db"
-else:
-    DATABASE_URL = config.DATABASE_URL
+# Bump when tables or indexes are added so init_db creates them on existing
+# databases. create_all never alters existing tables: new columns on an
+# existing table still need a manual migration.
+SCHEMA_VERSION = 1
 
-engine = create_async_engine(DATABASE_URL, echo=False)
-AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA busy_timeout=3000",
+    "PRAGMA wal_autocheckpoint=1000",
+)
+
+# Built lazily so importing this module doesn't construct an engine
+_database_url = None
+_engine = None
+_sessionmaker = None
+# Set by close_db so late callers fail instead of building a fresh engine
+_closed = False
+
+def _json_default(obj):
+    """Fallback for values orjson can't encode natively"""
+    # numpy/pandas scalars not covered by OPT_SERIALIZE_NUMPY
+    if hasattr(obj, 'item'):
+        return obj.item()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def _json_dumps(obj) -> str:
+    """Compact orjson encoding for JSON columns (stored as TEXT)"""
+    # Prices come from pandas, so metrics and trades carry numpy floats
+    return orjson.dumps(
+        obj, option=orjson.OPT_SERIALIZE_NUMPY, default=_json_default
+    ).decode()
+
+def _set_sqlite_pragmas(dbapi_conn, _):
+    """Tune SQLite for write-heavy trade logging (WAL, fewer fsyncs)"""
+    # The aiosqlite DBAPI adapter has no executescript, so run one by one
+    cursor = dbapi_conn.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+def _get_database_url() -> str:
+    """Resolve the database URL from the cached config"""
+    global _database_url
+    
+    if _database_url is None:
+        config = TradingConfig.from_env()
+        
+        # Use SQLite for Render (file-based)
+        if config.RENDER:
+            # Use file-based SQLite on Render
+            _database_url = "sqlite+aiosqlite:///./data/trades.db"
+        else:
+            _database_url = config.DATABASE_URL
+    
+    return _database_url
+
+def _get_engine():
+    """Get the shared async engine, creating it on first use"""
+    global _engine
+    
+    if _engine is None:
+        if _closed:
+            raise RuntimeError("Database is closed")
+        
+        database_url = _get_database_url()
+        
+        if database_url.startswith("sqlite"):
+            # Create data directory before the engine points at ./data/trades.db
+            os.makedirs("data", exist_ok=True)
+            
+            # Single-writer embedded DB: keep one connection open instead of
+            # reconnecting (and re-running the PRAGMA hook) on every checkout
+            _engine = create_async_engine(
+                database_url,
+                echo=False,
+                json_serializer=_json_dumps,
+                json_deserializer=orjson.loads,
+                poolclass=StaticPool,
+                connect_args={"check_same_thread": False}
+            )
+            event.listen(_engine.sync_engine, "connect", _set_sqlite_pragmas)
+        else:
+            # Server databases keep the default AsyncAdaptedQueuePool
+            _engine = create_async_engine(
+                database_url,
+                echo=False,
+                json_serializer=_json_dumps,
+                json_deserializer=orjson.loads
+            )
+    
+    return _engine
+
+def _get_sessionmaker():
+    """Get the session factory bound to the shared engine"""
+    global _sessionmaker
+    
+    if _sessionmaker is None:
+        if _closed:
+            raise RuntimeError("Database is closed")
+        
+        _sessionmaker = async_sessionmaker(
+            _get_engine(), class_=AsyncSession, expire_on_commit=False
+        )
+    
+    return _sessionmaker
+
+_session = None
+_session_lock = asyncio.Lock()
+
+@asynccontextmanager
+async def get_session():
+    """Check out the shared long-lived session (one user at a time)"""
+    global _session
+    
+    async with _session_lock:
+        if _session is None:
+            _session = _get_sessionmaker()()
+        try:
+            yield _session
+        finally:
+            # Don't leave read transactions open between calls; a stale
+            # read snapshot would stop WAL checkpoints from completing
+            if _session.in_transaction():
+                await _session.rollback()
 
 class Base(DeclarativeBase):
     pass
 
 class TradeLog(Base):
     __tablename__ = 'trades'
+    __table_args__ = (
+        Index('ix_trades_symbol_opened', 'symbol', 'opened_at'),
+        Index('ix_trades_status_opened', 'status', 'opened_at'),
+    )
     
     id = Column(String, primary_key=True)
-    symbol = Column(String, index=True)
+    symbol = Column(String)
     side = Column(String)
     quantity = Column(Float)
     entry_price = Column(Float)
@@ -39,8 +172,15 @@ class TradeLog(Base):
     opened_at = Column(DateTime, index=True)
     closed_at = Column(DateTime)
     reason = Column(String)
-    metadata = Column(JSON)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # 'metadata' is reserved on declarative classes; keep the DB column name
+    extra_metadata = Column("metadata", JSON)
+    # Clock is read by the database, not by a Python callable per row; the
+    # inline default also covers tables created before server_default existed
+    created_at = Column(
+        DateTime,
+        default=func.current_timestamp(),
+        server_default=func.current_timestamp()
+    )
 
 class BotSettings(Base):
     __tablename__ = 'bot_settings'
@@ -48,36 +188,245 @@ class BotSettings(Base):
     id = Column(Integer, primary_key=True)
     key = Column(String, unique=True, index=True)
     value = Column(JSON)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(
+        DateTime,
+        default=func.current_timestamp(),
+        server_default=func.current_timestamp(),
+        onupdate=func.current_timestamp()
+    )
+
+# Buffered trade writes: rows queued here are flushed in one transaction
+TRADE_FLUSH_INTERVAL = 0.2  # seconds
+TRADE_FLUSH_MAX_ROWS = 100
+TRADE_PENDING_MAX_ROWS = 10000  # oldest queued trades are dropped beyond this
+
+# _pending is only touched between awaits, so appends and swaps are atomic
+# on the event loop; _flush_lock just keeps two flushes from interleaving
+_pending: list[dict] = []
+_flush_lock = asyncio.Lock()
+_flush_task = None
+
+def _create_schema(sync_conn):
+    """Create missing tables, plus indexes missing from existing tables"""
+    Base.metadata.create_all(sync_conn)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
 
 async def init_db():
     """Initialize database"""
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    global _flush_task, _closed
+    
+    _closed = False
+    engine = _get_engine()
+    is_sqlite = _get_database_url().startswith("sqlite")
+    
+    # Skip create_all reflection when the schema is already in place
+    schema_version = 0
+    if is_sqlite:
+        async with engine.connect() as conn:
+            result = await conn.execute(text("PRAGMA user_version"))
+            schema_version = result.scalar() or 0
+    
+    if schema_version < SCHEMA_VERSION:
+        async with engine.begin() as conn:
+            await conn.run_sync(_create_schema)
+            # Gather planner statistics for indexes added to existing data
+            await conn.execute(text("ANALYZE"))
+            if is_sqlite:
+                await conn.execute(text(f"PRAGMA user_version = {SCHEMA_VERSION}"))
+    
+    # Start background flusher for buffered trade writes
+    if _flush_task is None or _flush_task.done():
+        _flush_task = asyncio.create_task(_flush_loop())
+
+async def close_db():
+    """Flush pending writes, checkpoint the WAL and dispose the engine"""
+    global _engine, _sessionmaker, _session, _flush_task, _closed
+    
+    if _engine is not None:
+        # Make sure the final flush below has a session factory to use
+        _get_sessionmaker()
+    
+    # From here on no new trades are queued and no new engine is built
+    _closed = True
+    
+    if _flush_task is not None:
+        # Wait for the flusher to stop so an in-flight batch is re-queued
+        # before the final flush below
+        _flush_task.cancel()
+        try:
+            await _flush_task
+        except asyncio.CancelledError:
+            pass
+        _flush_task = None
+    
+    try:
+        await flush_pending_trades()
+    except Exception as e:
+        logger.error(f"Failed to flush trades: {e}")
+    
+    if _pending:
+        logger.error(f"Dropping {len(_pending)} trades that were never written")
+        _pending.clear()
     
-    # Create data directory if it doesn't exist
-    os.makedirs("data", exist_ok=True)
+    if _engine is None:
+        return
+    
+    # Wait for any caller still using the shared session
+    async with _session_lock:
+        if _session is not None:
+            await _session.close()
+            _session = None
+        _sessionmaker = None
+    
+    if _get_database_url().startswith("sqlite"):
+        # Refresh planner statistics for the tables this run queried, then
+        # fold the WAL back into the main file so it doesn't grow unbounded
+        async with _engine.connect() as conn:
+            await conn.execute(text("PRAGMA optimize"))
+            await conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+    
+    await _engine.dispose()
+    _engine = None
 
 async def get_db():
     """Get database session"""
-    async with AsyncSessionLocal() as session:
+    async with get_session() as session:
         yield session
 
 async def log_trade(trade_data: dict):
     """Log a trade to database"""
-    async with AsyncSessionLocal() as session:
+    async with get_session() as session:
+        try:
+            await session.execute(
+                TradeLog.__table__.insert().values(**_trade_row(trade_data))
+            )
+            await session.commit()
+            return True
+        except Exception as e:
+            await session.rollback()
+            raise e
+
+# TradeLog attribute name -> trades column key, built once on first use
+_trade_column_keys: dict[str, str] = {}
+
+def _trade_row(trade_data: dict) -> dict:
+    """Map TradeLog attribute names to trades column keys, dropping the rest"""
+    if not _trade_column_keys:
+        # extra_metadata is stored in the "metadata" column
+        _trade_column_keys.update(
+            (prop.key, prop.columns[0].key)
+            for prop in TradeLog.__mapper__.column_attrs
+        )
+    return {
+        _trade_column_keys[k]: v
+        for k, v in trade_data.items() if k in _trade_column_keys
+    }
+
+async def log_trades_bulk(trades: list[dict]):
+    """Insert many trades in a single transaction"""
+    if not trades:
+        return True
+    
+    async with get_session() as session:
         try:
-            trade_log = TradeLog(**trade_data)
-            session.add(trade_log)
+            await session.execute(
+                TradeLog.__table__.insert(),
+                [_trade_row(t) for t in trades]
+            )
             await session.commit()
             return True
         except Exception as e:
             await session.rollback()
             raise e
 
+async def log_trade_buffered(trade_data: dict):
+    """Queue a trade for the next batched flush instead of committing now"""
+    if _closed:
+        raise RuntimeError("Database is closed")
+    
+    _pending.append(trade_data)
+    
+    if len(_pending) >= TRADE_FLUSH_MAX_ROWS and not _flush_lock.locked():
+        await flush_pending_trades()
+
+async def flush_pending_trades():
+    """Write all queued trades in one transaction"""
+    async with _flush_lock:
+        if not _pending:
+            return
+        # Swap the batch out so new trades can be queued during the write
+        batch = _pending.copy()
+        _pending.clear()
+        
+        try:
+            await log_trades_bulk(batch)
+        except StatementError as e:
+            if _is_transient(e):
+                # Database locked/busy: retry the batch next flush
+                _requeue(batch)
+                raise
+            # A bad row (duplicate id, missing column, read-only DB) would fail
+            # the batch forever; write rows one by one and drop what can't go in
+            _requeue(await _insert_rows_individually(batch))
+        except BaseException:
+            # Put the batch back so the next flush retries it (this includes
+            # cancellation of the flusher mid-write)
+            _requeue(batch)
+            raise
+
+def _is_transient(error: StatementError) -> bool:
+    """Whether a failed write is worth retrying (SQLite lock contention)"""
+    if not isinstance(error, OperationalError):
+        return False
+    message = str(error.orig).lower()
+    return "locked" in message or "busy" in message
+
+def _requeue(rows: list[dict]):
+    """Put unwritten trades back at the front of the queue, bounded in size"""
+    _pending[:0] = rows
+    overflow = len(_pending) - TRADE_PENDING_MAX_ROWS
+    if overflow > 0:
+        logger.error(f"Trade write queue full, dropping {overflow} oldest trades")
+        del _pending[:overflow]
+
+async def _insert_rows_individually(batch: list[dict]) -> list[dict]:
+    """Insert trades one at a time; returns the rows worth retrying"""
+    retry = []
+    for i, row in enumerate(batch):
+        try:
+            await log_trades_bulk([row])
+        except StatementError as e:
+            if _is_transient(e):
+                retry.append(row)
+            else:
+                logger.error(f"Dropping trade {row.get('id')} that cannot be written: {e}")
+        except BaseException:
+            # Cancelled mid-way: keep everything not yet written
+            _requeue(retry + batch[i:])
+            raise
+    return retry
+
+async def _flush_loop():
+    """Periodically flush buffered trade writes"""
+    while True:
+        try:
+            await asyncio.sleep(TRADE_FLUSH_INTERVAL)
+            await flush_pending_trades()
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error(f"Failed to flush trades: {e}")
+
 async def get_recent_trades(limit: int = 50):
     """Get recent trades"""
-    async with AsyncSessionLocal() as session:
+    try:
+        await flush_pending_trades()
+    except Exception as e:
+        logger.error(f"Failed to flush trades: {e}")
+    
+    async with get_session() as session:
         from sqlalchemy import desc
         result = await session.execute(
             TradeLog.__table__.select()
@@ -88,12 +437,19 @@ async def get_recent_trades(limit: int = 50):
 
 async def update_trade(trade_id: str, update_data: dict):
     """Update trade record"""
-    async with AsyncSessionLocal() as session:
+    # The row may still be sitting in the write buffer; a failure to write
+    # other buffered rows shouldn't stop this update
+    try:
+        await flush_pending_trades()
+    except Exception as e:
+        logger.error(f"Failed to flush trades: {e}")
+    
+    async with get_session() as session:
         try:
             result = await session.execute(
                 TradeLog.__table__.update()
-                .where(TradeLog.id == trade_id)
-                .values(**update_data)
+                .where(TradeLog.__table__.c.id == trade_id)
+                .values(**_trade_row(update_data))
             )
             await session.commit()
             return result.rowcount > 0
@@ -103,7 +459,7 @@ async def update_trade(trade_id: str, update_data: dict):
 
 async def get_bot_setting(key: str):
     """Get bot setting"""
-    async with AsyncSessionLocal() as session:
+    async with get_session() as session:
         result = await session.execute(
             BotSettings.__table__.select()
             .where(BotSettings.key == key)
@@ -113,27 +469,15 @@ async def get_bot_setting(key: str):
 
 async def set_bot_setting(key: str, value):
     """Set bot setting"""
-    async with AsyncSessionLocal() as session:
+    async with get_session() as session:
         try:
-            # Check if setting exists
-            result = await session.execute(
-                BotSettings.__table__.select()
-                .where(BotSettings.key == key)
+            # Single INSERT ... ON CONFLICT(key) DO UPDATE instead of SELECT + write
+            stmt = sqlite_insert(BotSettings).values(key=key, value=value)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['key'],
+                set_={'value': stmt.excluded.value, 'updated_at': func.current_timestamp()}
             )
-            row = result.fetchone()
-            
-            if row:
-                # Update existing
-                await session.execute(
-                    BotSettings.__table__.update()
-                    .where(BotSettings.key == key)
-                    .values(value=value)
-                )
-            else:
-                # Insert new
-                setting = BotSettings(key=key, value=value)
-                session.add(setting)
-            
+            await session.execute(stmt)
             await session.commit()
             return True
         except Exception as e:
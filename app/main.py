@@ -2,9 +2,8 @@ import asyncio
 import logging
 import sys
 import signal
-import os
+import time
 from datetime import datetime
-from dotenv import load_dotenv
 
 from app.config import TradingConfig
 from core.trading_engine import TradingEngine
@@ -14,9 +13,19 @@ from utils.logger import setup_logger
 # Setup logger
 logger = setup_logger(__name__)
 
+# Health check timestamp cache: (monotonic time, isoformat string)
+_timestamp_cache = [0.0, ""]
+
+def _cached_timestamp(ttl: float = 1.0) -> str:
+    """Current time in isoformat, recomputed at most once per ttl seconds"""
+    now = time.monotonic()
+    if now - _timestamp_cache[0] >= ttl:
+        _timestamp_cache[0] = now
+        _timestamp_cache[1] = datetime.now().isoformat()
+    return _timestamp_cache[1]
+
 class ScalpingBot:
     def __init__(self):
-        load_dotenv()
         self.config = TradingConfig.from_env()
         
         # Validate required configuration
@@ -25,37 +34,61 @@ class ScalpingBot:
         self.trading_engine = TradingEngine(self.config)
         self.telegram_bot = TelegramBot(self.config, self.trading_engine)
         
-        # Signal handlers for graceful shutdown
-        signal.signal(signal.SIGINT, self.signal_handler)
-        signal.signal(signal.SIGTERM, self.signal_handler)
+        # Shutdown state (signal handlers are installed on the loop in run())
+        self._stop = asyncio.Event()
+        self._shutdown_task = None
+        self._health_server = None
+        self._shutting_down = False
         
         # Health check endpoint for Render
-        self.health_check_port = int(os.getenv('HEALTH_CHECK_PORT', 8080))
+        self.health_check_port = self.config.HEALTH_CHECK_PORT
     
     def _validate_config(self):
         """Validate required configuration"""
         required_vars = ['BYBIT_API_KEY', 'BYBIT_API_SECRET']
-        missing = [var for var in required_vars if not os.getenv(var)]
+        missing = [var for var in required_vars if not getattr(self.config, var)]
         
         if missing:
             logger.error(f"Missing required environment variables: {missing}")
             sys.exit(1)
     
-    def signal_handler(self, signum, frame):
-        """Handle shutdown signals"""
+    def signal_handler(self, signum):
+        """Handle shutdown signals (runs on the event loop)"""
         logger.info(f"Received signal {signum}, initiating graceful shutdown...")
-        asyncio.create_task(self.shutdown())
+        if self._shutdown_task is None:
+            self._shutdown_task = asyncio.create_task(self.shutdown())
     
     async def shutdown(self):
         """Graceful shutdown procedure"""
+        if self._shutting_down:
+            return
+        self._shutting_down = True
+        
         logger.info("Shutting down trading bot...")
         
         # Stop trading engine
         if hasattr(self, 'trading_engine'):
             await self.trading_engine.stop()
         
+        # Stop Telegram polling
+        if self.config.TELEGRAM_BOT_TOKEN:
+            await self.telegram_bot.stop_polling()
+        
+        # Stop the health check server
+        if self._health_server is not None:
+            self._health_server.should_exit = True
+        
+        # Flush trade writes and checkpoint the SQLite WAL
+        try:
+            from app.database import close_db
+            await close_db()
+        except Exception as e:
+            logger.error(f"Failed to close database: {e}")
+        
         logger.info("Shutdown complete")
-        sys.exit(0)
+        
+        # Let run() return so asyncio.run() can finish cleanly
+        self._stop.set()
     
     async def start_health_check(self):
         """Start health check endpoint for Render"""
@@ -71,13 +104,15 @@ class ScalpingBot:
         
         app = FastAPI(lifespan=lifespan)
         
+        # Static part of the root response, built once
+        service_info = {
+            "status": "running",
+            "service": "hft-scalping-bot"
+        }
+        
         @app.get("/")
         async def root():
-            return {
-                "status": "running",
-                "service": "hft-scalping-bot",
-                "timestamp": datetime.now().isoformat()
-            }
+            return {**service_info, "timestamp": _cached_timestamp()}
         
         @app.get("/health")
         async def health_check():
@@ -85,7 +120,7 @@ class ScalpingBot:
                 "status": "healthy",
                 "engine_running": self.trading_engine.is_running,
                 "open_trades": len(self.trading_engine.open_trades),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _cached_timestamp()
             }
         
         @app.get("/metrics")
@@ -104,22 +139,31 @@ class ScalpingBot:
             app,
             host="0.0.0.0",
             port=self.health_check_port,
-            log_level="info"
+            log_level="warning",
+            access_log=False  # Render probes would log a line per request
         )
         server = uvicorn.Server(config)
+        # uvicorn would replace the bot's SIGINT/SIGTERM handlers with its
+        # own, which only stop the server; shutdown() stops it instead
+        server.install_signal_handlers = lambda: None
+        self._health_server = server
         
         # Run server in background task
         asyncio.create_task(server.serve())
-        logger.info(f"Health check server started on port {self.health_check_port}")
+        logger.info("Health check server started on port %s", self.health_check_port)
     
     async def run(self):
         """Main application runner"""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.signal_handler, sig)
+        
         try:
             logger.info("=" * 60)
             logger.info("Starting High Frequency Scalping Bot")
-            logger.info(f"Environment: {'TESTNET' if self.config.BYBIT_TESTNET else 'LIVE'}")
-            logger.info(f"Trading Symbol: {self.config.SYMBOL}")
-            logger.info(f"Leverage: {self.config.LEVERAGE}x")
+            logger.info("Environment: %s", 'TESTNET' if self.config.BYBIT_TESTNET else 'LIVE')
+            logger.info("Trading Symbol: %s", self.config.SYMBOL)
+            logger.info("Leverage: %sx", self.config.LEVERAGE)
             logger.info("=" * 60)
             
             # Start health check endpoint for Render
@@ -131,16 +175,17 @@ class ScalpingBot:
             
             # Start Telegram bot in background (if token provided)
             if self.config.TELEGRAM_BOT_TOKEN:
-                import threading
-                telegram_thread = threading.Thread(
-                    target=self.telegram_bot.run_polling,
-                    daemon=True
-                )
-                telegram_thread.start()
-                logger.info("Telegram bot started")
+                # Polls on this event loop; no separate thread
+                if await self.telegram_bot.start_polling():
+                    logger.info("Telegram bot started")
             else:
                 logger.warning("Telegram bot token not configured")
             
+            # Don't start trading if a signal already began shutdown
+            if self._shutting_down:
+                await self._stop.wait()
+                return
+            
             # Start trading engine
             await self.trading_engine.start()
             
@@ -156,8 +201,7 @@ class ScalpingBot:
             
             # Keep application running
             logger.info("Bot is now running. Press Ctrl+C to stop.")
-            while True:
-                await asyncio.sleep(3600)  # Check every hour
+            await self._stop.wait()
                 
         except Exception as e:
             logger.error(f"Fatal error: {e}", exc_info=True)
@@ -172,6 +216,13 @@ class ScalpingBot:
 
 def main():
     """Application entry point"""
+    # uvloop is optional; fall back to the default loop if it's missing
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    
     try:
         bot = ScalpingBot()
         asyncio.run(bot.run())
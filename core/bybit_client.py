@@ -177,7 +177,7 @@ class BybitClient:
             
             if response['retCode'] == 0:
                 order_id = response['result']['orderId']
-                self.logger.info(f"Order placed: {order_id} - {side} {quantity} {self.config.SYMBOL}")
+                self.logger.info("Order placed: %s - %s %s %s", order_id, side, quantity, self.config.SYMBOL)
                 return response['result']
             else:
                 self.logger.error(f"Order failed: {response['retMsg']}")
@@ -198,7 +198,7 @@ class BybitClient:
             )
             success = response['retCode'] == 0
             if success:
-                self.logger.info(f"Order cancelled: {order_id}")
+                self.logger.info("Order cancelled: %s", order_id)
             else:
                 self.logger.error(f"Failed to cancel order: {response['retMsg']}")
             return success
@@ -13,7 +13,7 @@ from app.config import TradingConfig
 from core.bybit_client import BybitClient
 from core.ml_predictor import MLPredictor
 from core.risk_manager import RiskManager
-from app.database import log_trade, update_trade, get_bot_setting, set_bot_setting
+from app.database import log_trade_buffered, flush_pending_trades, update_trade, get_bot_setting, set_bot_setting
 
 logger = logging.getLogger(__name__)
 
@@ -46,7 +46,7 @@ class Trade:
         """Convert trade to dictionary for database"""
         data = asdict(self)
         data['status'] = self.status.value
-        data['metadata'] = {
+        data['extra_metadata'] = {
             'version': '2.0',
             'strategy': 'ml_scalping'
         }
@@ -135,6 +135,12 @@ class TradingEngine:
         # Save state
         await self._save_state()
         
+        # Persist any buffered trade writes
+        try:
+            await flush_pending_trades()
+        except Exception as e:
+            self.logger.error(f"Failed to flush trades: {e}")
+        
         # Close all open positions
         await self.close_all_positions()
         
@@ -268,15 +274,15 @@ class TradingEngine:
                 # Add to open trades
                 self.open_trades[trade.id] = trade
                 
-                # Log the trade to database
-                await log_trade(trade.to_dict())
+                # Queue the trade for the next batched database write
+                await log_trade_buffered(trade.to_dict())
                 
                 # Update metrics
                 self.metrics['total_trades'] += 1
                 
                 self.logger.info(
-                    f"Trade executed: {trade.side} {trade.quantity} {trade.symbol} "
-                    f"at ${trade.entry_price:.2f}"
+                    "Trade executed: %s %s %s at $%.2f",
+                    trade.side, trade.quantity, trade.symbol, trade.entry_price
                 )
                 
                 # Update risk manager
@@ -393,9 +399,8 @@ class TradingEngine:
                 self.open_trades.pop(trade.id, None)
                 
                 self.logger.info(
-                    f"Trade closed: {trade.id} "
-                    f"P&L: ${trade.pnl:.2f} ({trade.pnl_percentage:.2f}%) "
-                    f"Reason: {reason}"
+                    "Trade closed: %s P&L: $%.2f (%.2f%%) Reason: %s",
+                    trade.id, trade.pnl, trade.pnl_percentage, reason
                 )
                 
         except Exception as e:
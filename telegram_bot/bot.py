@@ -129,12 +129,13 @@ Use /status to check current bot state.
     async def status(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show bot status"""
         try:
-            # Get account balance
-            balance = self.engine.client.get_account_balance()
+            # Get account balance (pybit is blocking, so keep its HTTP calls
+            # off the event loop the trading loop runs on)
+            balance = await asyncio.to_thread(self.engine.client.get_account_balance)
             usdt_balance = float(balance.get('totalEquity', 0)) if balance else 0
             
             # Get current price
-            market_data = self.engine.client.get_market_data()
+            market_data = await asyncio.to_thread(self.engine.client.get_market_data)
             current_price = float(market_data.get('lastPrice', 0)) if market_data else 0
             
             status_text = f"""
@@ -219,7 +220,7 @@ Use /status to check current bot state.
     async def show_balance(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show account balance"""
         try:
-            balance = self.engine.client.get_account_balance()
+            balance = await asyncio.to_thread(self.engine.client.get_account_balance)
             
             if not balance:
                 await update.message.reply_text("Could not fetch balance.")
@@ -239,7 +240,7 @@ Use /status to check current bot state.
             """
             
             # Get open positions
-            positions = self.engine.client.get_open_positions()
+            positions = await asyncio.to_thread(self.engine.client.get_open_positions)
             if positions:
                 balance_text += "\n*Open Positions:*"
                 for pos in positions:
@@ -312,7 +313,7 @@ Use /status to check current bot state.
     async def show_positions(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show open positions"""
         try:
-            positions = self.engine.client.get_open_positions()
+            positions = await asyncio.to_thread(self.engine.client.get_open_positions)
             
             if not positions or all(float(p.get('size', 0)) == 0 for p in positions):
                 await update.message.reply_text("No open positions.")
@@ -456,7 +457,7 @@ Use /status to check current bot state.
             leverage = int(context.args[0])
             if 1 <= leverage <= 100:
                 self.config.LEVERAGE = leverage
-                success = self.engine.client._set_leverage(leverage)
+                success = await asyncio.to_thread(self.engine.client._set_leverage, leverage)
                 if success:
                     await update.message.reply_text(f"✅ Leverage set to {leverage}x")
                 else:
@@ -546,6 +547,9 @@ Use /status to check current bot state.
     
     async def send_notification(self, message: str):
         """Send notification to admin chat"""
+        if not self.config.TELEGRAM_CHAT_ID:
+            return
+        
         try:
             await self.application.bot.send_message(
                 chat_id=self.config.TELEGRAM_CHAT_ID,
@@ -555,15 +559,29 @@ Use /status to check current bot state.
         except Exception as e:
             logger.error(f"Failed to send notification: {e}")
     
-    def run_polling(self):
-        """Run the Telegram bot with polling"""
+    async def start_polling(self) -> bool:
+        """Start polling for updates on the running event loop"""
         logger.info("Starting Telegram bot polling...")
         
         try:
-            self.application.run_polling(
+            await self.application.initialize()
+            await self.application.start()
+            await self.application.updater.start_polling(
                 allowed_updates=Update.ALL_TYPES,
-                drop_pending_updates=True,
-                close_loop=False
+                drop_pending_updates=True
             )
+            return True
         except Exception as e:
             logger.error(f"Telegram bot failed: {e}")
+            return False
+    
+    async def stop_polling(self):
+        """Stop polling and shut the Telegram application down"""
+        try:
+            if self.application.updater.running:
+                await self.application.updater.stop()
+            if self.application.running:
+                await self.application.stop()
+            await self.application.shutdown()
+        except Exception as e:
+            logger.error(f"Failed to stop Telegram bot: {e}")
@@ -0,0 +1,67 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app import database
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Point app.database at a throwaway SQLite file"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        database, "_database_url", f"sqlite+aiosqlite:///{tmp_path}/trades.db"
+    )
+    monkeypatch.setattr(database, "_closed", False)
+    return database
+
+
+def test_trade_insert_update_read_round_trip(db):
+    async def scenario():
+        await db.init_db()
+        try:
+            # Shaped like Trade.to_dict(): includes a non-column key (order_id)
+            trade = {
+                'id': 'a1',
+                'symbol': 'BTCUSDT',
+                'side': 'Buy',
+                'quantity': 0.001,
+                'entry_price': 50000.0,
+                'status': 'open',
+                'opened_at': datetime(2024, 1, 1, 12, 0),
+                'order_id': 'a1',
+                'extra_metadata': {'version': '2.0'},
+            }
+            await db.log_trade_buffered(trade)
+            
+            closed = dict(trade, status='closed', exit_price=50100.0, pnl=0.1)
+            assert await db.update_trade('a1', closed)
+            
+            rows = await db.get_recent_trades(limit=10)
+        finally:
+            await db.close_db()
+        return rows
+    
+    rows = asyncio.run(scenario())
+    
+    assert len(rows) == 1
+    row = rows[0]._mapping
+    assert row['status'] == 'closed'
+    assert row['exit_price'] == 50100.0
+    assert row['metadata'] == {'version': '2.0'}
+    assert row['created_at'] is not None
+
+
+def test_calls_after_close_db_fail_instead_of_reopening(db):
+    async def scenario():
+        await db.init_db()
+        await db.close_db()
+        
+        with pytest.raises(RuntimeError):
+            await db.log_trade_buffered({'id': 'late'})
+        with pytest.raises(RuntimeError):
+            await db.get_bot_setting('metrics')
+        assert db._engine is None
+    
+    asyncio.run(scenario())